@@ -4,11 +4,18 @@ and writes a .json file where each line has a separate JSON structure
 following the same schema rules.
 """
 
+import functools
 import json
 import re
+from multiprocessing import Pool
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson  # optional: C-speed JSON encoding, ~2-5x faster on nested dicts
+except ImportError:
+    orjson = None
+
 from sympy import sympify
 from sympy.core import Add, Mul, Pow
 from sympy.core.numbers import Integer, Rational, Float
@@ -27,6 +34,29 @@ from sympy.core.expr import Expr
 # Expression nodes: "constant" | "variable" | "sum" | "product" | "power" | "quotient" | "absolute_value" | "function_call"
 
 
+# Precompiled patterns for _normalize_line (hot per-line path; avoids the
+# re-module cache lookup on every call).
+_RE_CARET_NUM = re.compile(r"\^(\d+)")
+_RE_CARET_SYM = re.compile(r"\^([a-zA-Z]+)")
+_RE_IMPLICIT_MUL = re.compile(r"(\d)\s*([a-zA-Z\(])")
+_RE_PAREN_ADJ = re.compile(r"\)\s*\(")
+_RE_ABS = re.compile(r"\|\s*([^|]+?)\s*\|")
+
+# Fast-path patterns for the canonical shapes emitted by the generators in
+# equations.py (matched against the normalized line, so `*` is explicit).
+_RE_LINEAR = re.compile(r"^\s*(-?\s*\d+)\s*\*\s*x\s*([+-])\s*(\d+)\s*=\s*(-?\d+)\s*$")
+_RE_LINEAR_CONST_FIRST = re.compile(r"^\s*(-?\s*\d+)\s*([+-])\s*(\d+)\s*\*\s*x\s*=\s*(-?\d+)\s*$")
+_RE_FACTORED = re.compile(
+    r"^\s*\(\s*x\s*([+-])\s*(\d+)\s*\)\s*\*\s*\(\s*x\s*([+-])\s*(\d+)\s*\)\s*=\s*(-?\d+)\s*$"
+)
+_RE_PIECE_EXPR = re.compile(r"^\s*(-?\d+)\s*\*\s*x\s*\+\s*(-?\d+)\s*$")
+_RE_PIECE_COND = re.compile(r"^\s*x\s*(>=|<=|>|<)\s*0\s*$")
+
+_RE_PIECEWISE = re.compile(r"f\s*\(\s*x\s*\)\s*=\s*\{\s*(.+)\s*\}\s*$", re.IGNORECASE)
+# Two-char relations first so "<=" is not read as "<" then "=".
+_RE_REL = re.compile(r"<=|>=|<|>|=")
+
+
 def _normalize_line(line: str) -> str:
     """Normalize notation for parsing: unicode, ^n, implicit multiplication, | | -> Abs()."""
     line = line.strip()
@@ -38,32 +68,27 @@ def _normalize_line(line: str) -> str:
     # Unicode superscripts (² ³ etc.)
     line = line.replace("²", "**2").replace("³", "**3")
     # Caret powers: x^2 -> x**2, x^n -> x**n (be careful with 10^2)
-    line = re.sub(r"\^(\d+)", r"**\1", line)
-    line = re.sub(r"\^([a-zA-Z]+)", r"**\1", line)
+    line = _RE_CARET_NUM.sub(r"**\1", line)
+    line = _RE_CARET_SYM.sub(r"**\1", line)
 
     # Insert * between number and letter/paren: "232 x" -> "232*x", "2(x+1)" -> "2*(x+1)"
-    line = re.sub(r"(\d)\s*([a-zA-Z\(])", r"\1*\2", line)
+    line = _RE_IMPLICIT_MUL.sub(r"\1*\2", line)
     # Between ) and ( for factored: "(x-1)(x+2)" -> "(x-1)*(x+2)"
-    line = re.sub(r"\)\s*\(", r")*(", line)
+    line = _RE_PAREN_ADJ.sub(r")*(", line)
 
-    # Absolute value: |expr| -> Abs(expr). Match innermost |...| first.
+    # Absolute value: |expr| -> Abs(expr). One non-overlapping pass replaces
+    # all innermost pairs at once; loop only for nested ||...|| (rare).
     while "|" in line:
-        match = re.search(r"\|\s*([^|]+)\s*\|", line)
-        if not match:
+        line, count = _RE_ABS.subn(lambda m: f"Abs({m.group(1).strip()})", line)
+        if not count:
             break
-        inner = match.group(1).strip()
-        line = line[: match.start()] + f"Abs({inner})" + line[match.end() :]
 
     return line
 
 
 def _parse_piecewise(line: str) -> dict[str, Any] | None:
     """Parse piecewise line: f(x) = { 9x + 10 , x >= 0 ; 6x + -14 , x < 0 }"""
-    m = re.match(
-        r"f\s*\(\s*x\s*\)\s*=\s*\{\s*(.+)\s*\}\s*$",
-        line.strip(),
-        re.IGNORECASE,
-    )
+    m = _RE_PIECEWISE.match(line.strip())
     if not m:
         return None
     content = m.group(1).strip()
@@ -79,6 +104,22 @@ def _parse_piecewise(line: str) -> dict[str, Any] | None:
             continue
         expr_str = _normalize_line(part[:idx])
         cond_str = _normalize_line(part[idx + 1 :])
+        # Fast path: canonical generated branch `a*x + b , x >= 0` needs no sympify.
+        expr_m = _RE_PIECE_EXPR.match(expr_str)
+        cond_m = _RE_PIECE_COND.match(cond_str)
+        if expr_m and cond_m:
+            a, b = int(expr_m.group(1)), int(expr_m.group(2))
+            if a not in (0, 1) and b != 0:
+                branches.append({
+                    "condition": {
+                        "type": "relational",
+                        "relation": cond_m.group(1),
+                        "lhs": {"type": "variable", "name": "x"},
+                        "rhs": {"type": "constant", "value": 0},
+                    },
+                    "expression": _linear_lhs_json(a, b),
+                })
+                continue
         try:
             expr = sympify(expr_str)
             cond = sympify(cond_str)
@@ -106,41 +147,66 @@ def _parse_piecewise(line: str) -> dict[str, Any] | None:
 
 def _detect_relation(normalized: str) -> tuple[str, str, str]:
     """Return (relation, lhs_str, rhs_str). relation one of '=', '>', '<', '>=', '<='."""
-    for rel in [">=", "<=", "=", ">", "<"]:
-        if rel in normalized:
-            parts = normalized.split(rel, 1)
-            if len(parts) == 2:
-                return (rel, parts[0].strip(), parts[1].strip())
+    m = _RE_REL.search(normalized)
+    if m:
+        return (m.group(0), normalized[: m.start()].strip(), normalized[m.end() :].strip())
     return ("", normalized, "")
 
 
-def _expr_to_json(expr) -> dict[str, Any]:
-    """Convert SymPy expression to canonical JSON."""
-    if expr is None:
-        return {"type": "constant", "value": None}
+def _number_to_json(expr) -> dict[str, Any]:
+    try:
+        val = int(expr) if expr == int(expr) else float(expr)
+    except (TypeError, ValueError):
+        val = float(expr)
+    return {"type": "constant", "value": val}
 
-    if isinstance(expr, (Integer, Rational, Float)):
-        try:
-            val = int(expr) if expr == int(expr) else float(expr)
-        except (TypeError, ValueError):
-            val = float(expr)
-        return {"type": "constant", "value": val}
 
-    if isinstance(expr, SymSymbol):
-        return {"type": "variable", "name": str(expr.name)}
+def _symbol_to_json(expr) -> dict[str, Any]:
+    return {"type": "variable", "name": str(expr.name)}
 
-    if isinstance(expr, Add):
-        return {"type": "sum", "terms": [_expr_to_json(t) for t in expr.args]}
 
-    if isinstance(expr, Mul):
-        return {"type": "product", "factors": [_expr_to_json(a) for a in expr.args]}
+def _add_to_json(expr) -> dict[str, Any]:
+    return {"type": "sum", "terms": [_expr_to_json(t) for t in expr.args]}
 
-    if isinstance(expr, Pow):
-        return {
-            "type": "power",
-            "base": _expr_to_json(expr.base),
-            "exponent": _expr_to_json(expr.exp),
-        }
+
+def _mul_to_json(expr) -> dict[str, Any]:
+    return {"type": "product", "factors": [_expr_to_json(a) for a in expr.args]}
+
+
+def _pow_to_json(expr) -> dict[str, Any]:
+    return {
+        "type": "power",
+        "base": _expr_to_json(expr.base),
+        "exponent": _expr_to_json(expr.exp),
+    }
+
+
+# O(1) dispatch on exact node type for the common expression nodes; subclasses
+# (One, Half, ...) are resolved through the MRO once, then cached here.
+_DISPATCH = {
+    Integer: _number_to_json,
+    Rational: _number_to_json,
+    Float: _number_to_json,
+    SymSymbol: _symbol_to_json,
+    Add: _add_to_json,
+    Mul: _mul_to_json,
+    Pow: _pow_to_json,
+}
+
+
+def _expr_to_json(expr) -> dict[str, Any]:
+    """Convert SymPy expression to canonical JSON."""
+    if expr is None:
+        return {"type": "constant", "value": None}
+
+    handler = _DISPATCH.get(type(expr))
+    if handler is None:
+        for cls in type(expr).__mro__:
+            if cls in _DISPATCH:
+                handler = _DISPATCH.setdefault(type(expr), _DISPATCH[cls])
+                break
+    if handler is not None:
+        return handler(expr)
 
     # Relational (for piecewise conditions: x >= 0, x < 0)
     if isinstance(expr, Relational):
@@ -213,37 +279,51 @@ def _collect_variables(expr) -> set:
 
 
 def _classify_equation(lhs, rhs, relation: str, variables: set) -> str:
-    """Classify equation type."""
-    if relation != "=":
-        # Inequality
-        try:
-            expr = lhs - rhs
-            if hasattr(expr, "as_poly") and variables:
-                syms = getattr(lhs, "free_symbols", set()) | getattr(rhs, "free_symbols", set())
-                poly = expr.as_poly(*syms)
-                if poly and poly.degree() <= 1:
-                    return "inequality_linear"
-                if poly:
-                    return "inequality_polynomial"
-        except Exception:
-            pass
-        return "inequality"
+    """Classify equation type. Deterministic in its inputs, so results are
+    memoized: generated datasets repeat the same expression shapes and a
+    repeat costs a hash instead of as_poly/degree work."""
+    try:
+        return _classify_equation_cached(lhs, rhs, relation, frozenset(variables))
+    except TypeError:
+        # sympify can return plain Python containers (e.g. "{2}" -> set),
+        # which are unhashable; classify those without the cache.
+        return _classify_equation_impl(lhs, rhs, relation, variables)
 
-    if not variables:
-        return "constant"
 
-    syms = getattr(lhs, "free_symbols", set()) | getattr(rhs, "free_symbols", set())
-    expr = lhs - rhs
+@functools.lru_cache(maxsize=65536)
+def _classify_equation_cached(lhs, rhs, relation: str, variables: frozenset) -> str:
+    return _classify_equation_impl(lhs, rhs, relation, variables)
+
 
+def _classify_equation_impl(lhs, rhs, relation: str, variables: set) -> str:
+    # Compute the polynomial form once; every branch below reads the cached
+    # poly/degree instead of re-running as_poly.
+    syms = getattr(lhs, "free_symbols", set()) | getattr(rhs, "free_symbols", set())
+    try:
+        expr = lhs - rhs
+    except Exception:
+        expr = None
     try:
-        poly = expr.as_poly(*syms) if syms else None
+        poly = expr.as_poly(*syms) if (expr is not None and syms) else None
     except Exception:
         poly = None
+    deg = poly.degree() if poly is not None else None
 
-    if poly is not None:
-        if poly.degree() <= 1:
+    if relation != "=":
+        # Inequality
+        if variables and deg is not None:
+            if deg <= 1:
+                return "inequality_linear"
+            return "inequality_polynomial"
+        return "inequality"
+
+    if not variables:
+        return "constant"
+
+    if deg is not None:
+        if deg <= 1:
             return "linear"
-        if poly.degree() == 2:
+        if deg == 2:
             return "quadratic"
         return "polynomial"
 
@@ -283,12 +363,8 @@ def _classify_equation(lhs, rhs, relation: str, variables: set) -> str:
     if type(lhs).__name__ == "Abs" or (hasattr(lhs, "func") and getattr(lhs.func, "__name__", None) == "Abs"):
         return "absolute"
     # Parametric / multi-var linear
-    if len(syms) >= 2:
-        try:
-            if expr.as_poly(*syms).degree() <= 1:
-                return "parametric"
-        except Exception:
-            pass
+    if len(syms) >= 2 and deg is not None and deg <= 1:
+        return "parametric"
     # Functional
     if hasattr(lhs, "func") and hasattr(lhs.func, "__name__") and lhs.func.__name__ == "f":
         return "functional"
@@ -299,22 +375,104 @@ def _classify_equation(lhs, rhs, relation: str, variables: set) -> str:
     return "other"
 
 
-def parse_equation(line: str, equation_id: int = 1) -> dict[str, Any] | None:
-    """
-    Parse one equation line into the canonical JSON structure.
-    Returns one JSON object per line (same schema rules for all).
+def _linear_lhs_json(a: int, b: int) -> dict[str, Any]:
+    """JSON for a*x + b exactly as _expr_to_json renders the SymPy Add."""
+    return {
+        "type": "sum",
+        "terms": [
+            {"type": "constant", "value": b},
+            {
+                "type": "product",
+                "factors": [
+                    {"type": "constant", "value": a},
+                    {"type": "variable", "name": "x"},
+                ],
+            },
+        ],
+    }
+
+
+def _fast_parse(normalized: str, raw: str) -> dict[str, Any] | None:
+    """Build the JSON directly for canonical generated shapes, skipping sympify.
+
+    Handles `a*x + b = c` (either term order) and `(x + a)*(x + b) = c`.
+    Only shapes whose SymPy tree needs no simplification qualify (coefficient
+    not 0 or 1, nonzero constant, distinct factors); anything else returns
+    None and takes the sympify path. Output matches _expr_to_json exactly.
     """
-    raw = line.strip()
-    if not raw:
-        return None
+    m = _RE_LINEAR.match(normalized)
+    if m:
+        a = int(m.group(1).replace(" ", ""))
+        b = int(m.group(2) + m.group(3))
+        c = int(m.group(4))
+    else:
+        m = _RE_LINEAR_CONST_FIRST.match(normalized)
+        if m:
+            b = int(m.group(1).replace(" ", ""))
+            a = int(m.group(2) + m.group(3))
+            c = int(m.group(4))
+    if m:
+        if a in (0, 1) or b == 0:
+            return None
+        return {
+            "id": 0,  # set by parse_equation
+            "raw": raw,
+            "variables": ["x"],
+            "equation_type": "linear",
+            "relation": "=",
+            "lhs": _linear_lhs_json(a, b),
+            "rhs": {"type": "constant", "value": c},
+        }
+
+    m = _RE_FACTORED.match(normalized)
+    if m:
+        a = int(m.group(1) + m.group(2))
+        b = int(m.group(3) + m.group(4))
+        c = int(m.group(5))
+        # ±1 constants get special canonical ordering in Mul; leave them to sympify.
+        if a == b or a in (0, 1, -1) or b in (0, 1, -1):
+            return None
+        # Mul orders the two Add factors by their constant, ascending.
+        lo, hi = sorted((a, b))
+        factor = lambda k: {
+            "type": "sum",
+            "terms": [
+                {"type": "constant", "value": k},
+                {"type": "variable", "name": "x"},
+            ],
+        }
+        return {
+            "id": 0,  # set by parse_equation
+            "raw": raw,
+            "variables": ["x"],
+            "equation_type": "quadratic",
+            "relation": "=",
+            "lhs": {"type": "product", "factors": [factor(lo), factor(hi)]},
+            "rhs": {"type": "constant", "value": c},
+        }
+
+    return None
+
 
+@functools.lru_cache(maxsize=65536)
+def _parse_equation_cached(raw: str) -> dict[str, Any] | None:
+    """Parse a stripped, non-empty line into the JSON template (id unset).
+
+    Cached on the raw text: generated datasets repeat many lines, and a
+    repeated line costs only a dict lookup instead of sympify + classify.
+    The expression subtrees are shared between hits (read-only downstream).
+    """
     # Piecewise: special format
     pw = _parse_piecewise(raw)
     if pw is not None:
-        pw["id"] = equation_id
         return pw
 
     normalized = _normalize_line(raw)
+
+    fast = _fast_parse(normalized, raw)
+    if fast is not None:
+        return fast
+
     relation, lhs_str, rhs_str = _detect_relation(normalized)
     if not relation or not lhs_str or not rhs_str:
         return None
@@ -329,7 +487,7 @@ def parse_equation(line: str, equation_id: int = 1) -> dict[str, Any] | None:
     equation_type = _classify_equation(lhs, rhs, relation, set(variables))
 
     return {
-        "id": equation_id,
+        "id": 0,  # set by parse_equation
         "raw": raw,
         "variables": variables,
         "equation_type": equation_type,
@@ -339,21 +497,110 @@ def parse_equation(line: str, equation_id: int = 1) -> dict[str, Any] | None:
     }
 
 
-def parse_equations_file(input_path: str | Path, output_path: str | Path | None = None) -> dict[str, Any]:
+def parse_equation(line: str, equation_id: int = 1) -> dict[str, Any] | None:
+    """
+    Parse one equation line into the canonical JSON structure.
+    Returns one JSON object per line (same schema rules for all).
+    """
+    raw = line.strip()
+    if not raw:
+        return None
+
+    template = _parse_equation_cached(raw)
+    if template is None:
+        return None
+
+    parsed = dict(template)
+    parsed["id"] = equation_id
+    return parsed
+
+
+def _contains_float(obj: Any) -> bool:
+    """True if obj holds any float (orjson and stdlib json format them
+    differently, e.g. 0.0000169... vs 1.69e-05)."""
+    if isinstance(obj, float):
+        return True
+    if isinstance(obj, dict):
+        return any(_contains_float(v) for v in obj.values())
+    if isinstance(obj, list):
+        return any(_contains_float(v) for v in obj)
+    return False
+
+
+def _dumps_indent2(obj: Any) -> str:
+    """Encode obj as 2-space-indented JSON, via orjson when installed.
+
+    orjson output can diverge from the stdlib's: it emits raw UTF-8 where
+    the stdlib escapes non-ASCII (\\uXXXX), and it renders small/large
+    floats without scientific notation. Any payload that could differ is
+    encoded with json.dumps to keep the output byte-identical either way.
+    """
+    if orjson is not None and not _contains_float(obj):
+        try:
+            encoded = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            # orjson.JSONEncodeError: e.g. an int beyond 64 bits, which the
+            # stdlib encoder handles fine
+            return json.dumps(obj, indent=2)
+        if encoded.isascii():
+            return encoded
+    return json.dumps(obj, indent=2)
+
+
+def _write_result_json(result: dict[str, Any], output_path: Path) -> None:
+    """Write the result JSON one equation at a time.
+
+    Produces the same bytes as json.dump(result, out, indent=2) but never
+    serializes the whole document into one buffer: the header is written
+    first and each equation is encoded and flushed to the file on its own.
+    """
+    equations = result["equations"]
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 16) as out:
+        out.write("{\n")
+        out.write(f'  "source_file": {json.dumps(result["source_file"])},\n')
+        out.write(f'  "count": {result["count"]},\n')
+        if not equations:
+            out.write('  "equations": []\n}')
+            return
+        out.write('  "equations": [\n')
+        last = len(equations) - 1
+        for i, eq in enumerate(equations):
+            encoded = _dumps_indent2(eq)
+            out.write("    " + encoded.replace("\n", "\n    "))
+            out.write(",\n" if i != last else "\n")
+        out.write("  ]\n}")
+
+
+def parse_equations_file(
+    input_path: str | Path,
+    output_path: str | Path | None = None,
+    workers: int | None = None,
+) -> dict[str, Any]:
     """
     Read .txt file (one equation per line). Generate a separate JSON structure
     for each line following the same rules. Write to .json if output_path given.
+
+    Lines are independent and sympify is CPU-bound, so they are parsed in a
+    process pool. workers=None uses all cores; workers=1 parses in-process.
     """
     input_path = Path(input_path)
     if input_path.suffix.lower() != ".txt":
         raise ValueError("Input file must be a .txt file")
 
-    equations = []
-    with open(input_path, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f, start=1):
-            parsed = parse_equation(line, equation_id=i)
-            if parsed is not None:
-                equations.append(parsed)
+    # 64 KB buffer: refill once per chunk instead of per line on big datasets.
+    with open(input_path, "r", encoding="utf-8", buffering=1 << 16) as f:
+        lines = f.readlines()
+
+    if workers == 1:
+        results = (parse_equation(line, equation_id=i) for i, line in enumerate(lines, start=1))
+    else:
+        with Pool(workers) as pool:
+            results = pool.starmap(
+                parse_equation,
+                ((line, i) for i, line in enumerate(lines, start=1)),
+                chunksize=256,
+            )
+    equations = [parsed for parsed in results if parsed is not None]
 
     result = {
         "source_file": input_path.name,
@@ -365,8 +612,7 @@ def parse_equations_file(input_path: str | Path, output_path: str | Path | None
         output_path = Path(output_path)
         if output_path.suffix.lower() != ".json":
             output_path = output_path.with_suffix(".json")
-        with open(output_path, "w", encoding="utf-8") as out:
-            json.dump(result, out, indent=2)
+        _write_result_json(result, output_path)
 
     return result
 
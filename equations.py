@@ -1,9 +1,14 @@
 import random
+import numpy as np
 from sympy import symbols, latex, Eq , log , sqrt , StrictGreaterThan, StrictLessThan, GreaterThan, LessThan , Function , Piecewise, Ge, Lt
 
 x = symbols('x')
 f = Function('f')
 
+# Powers of x the generators reuse, built once instead of a SymPy Pow
+# construction per loop iteration
+X_POW = {d: x**d for d in range(6)}
+
 # -----------------------------
 # Expression generators
 # -----------------------------
@@ -20,7 +25,7 @@ def polynomial():
     for d in range(degree, -1, -1):
         coef = random.randint(-500, 500)
         if coef != 0:
-            expr += coef * x**d
+            expr += coef * X_POW[d]
     rhs = random.randint(-20, 20)
     return Eq(expr, rhs)
 
@@ -78,12 +83,22 @@ def generate_expression():
 # -----------------------------
 
 def generate_dataset(n=10000, filename="Piecewise_functions.txt"):
-    with open(filename, "w", encoding="utf-8") as f_out:
-        for _ in range(n):
-            a, b, c, d = generate_expression()
+    # Draw all coefficients in two vectorized calls instead of 4*n
+    # random.randint calls; lines are plain f-strings, no SymPy objects.
+    ac = np.random.randint(-10, 11, size=(n, 2))
+    bd = np.random.randint(-20, 21, size=(n, 2))
 
-            line = f"f(x) = {{ {a}x + {b} , x >= 0 ; {c}x + {d} , x < 0 }}"
-            f_out.write(line + "\n")
+    # Buffer lines and flush in 4096-line batches: one writelines call per
+    # batch instead of one f.write dispatch per equation.
+    with open(filename, "w", encoding="utf-8") as f_out:
+        buf = []
+        for (a, c), (b, d) in zip(ac.tolist(), bd.tolist()):
+            buf.append(f"f(x) = {{ {a}x + {b} , x >= 0 ; {c}x + {d} , x < 0 }}\n")
+            if len(buf) >= 4096:
+                f_out.writelines(buf)
+                buf.clear()
+        if buf:
+            f_out.writelines(buf)
 
     print(f"Saved {n} piecewise functions to {filename}")
 
@@ -1,13 +1,14 @@
 import random
 import json
 
-def generate_tree_example():
-    a = random.randint(1, 10)
-    b = random.randint(-20, 20)
-    x = random.randint(-10, 10)
+import numpy as np
 
-    c = a * x + b
+try:
+    import orjson  # optional: C-speed JSON encoding
+except ImportError:
+    orjson = None
 
+def _build_example(a, b, x, c):
     problem = f"{a}x + {b} = {c}"
 
     # Step 1
@@ -42,11 +43,32 @@ def generate_tree_example():
         "solution_tree": tree
     }
 
+def generate_tree_example():
+    a = random.randint(1, 10)
+    b = random.randint(-20, 20)
+    x = random.randint(-10, 10)
+
+    return _build_example(a, b, x, a * x + b)
+
 def generate_dataset(n=5000):
-    dataset = [generate_tree_example() for _ in range(n)]
+    # Draw all coefficients in three vectorized calls instead of 3*n
+    # random.randint calls
+    a = np.random.randint(1, 11, size=n)
+    b = np.random.randint(-20, 21, size=n)
+    x = np.random.randint(-10, 11, size=n)
+    c = a * x + b
+
+    dataset = [
+        _build_example(a_, b_, x_, c_)
+        for a_, b_, x_, c_ in zip(a.tolist(), b.tolist(), x.tolist(), c.tolist())
+    ]
 
-    with open("dataset.json", "w") as f:
-        json.dump(dataset, f, indent=4)
+    if orjson is not None:
+        with open("dataset.json", "wb") as f:
+            f.write(orjson.dumps(dataset, option=orjson.OPT_INDENT_2))
+    else:
+        with open("dataset.json", "w") as f:
+            json.dump(dataset, f, indent=2)
 
     print(f"Generated {n} tree-structured examples.")
 
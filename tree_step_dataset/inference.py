@@ -20,7 +20,7 @@ model.eval()
 test_equation = "3x + 7 = 22"
 src = encode(test_equation).unsqueeze(0)
 
-hidden, cell = model.encoder(src)
+hidden = model.encoder(src)
 
 input_token = torch.tensor([[stoi["<START>"]]])
 
@@ -29,7 +29,7 @@ max_len = 400
 
 with torch.no_grad():
     for _ in range(max_len):
-        output, hidden, cell = model.decoder(input_token, hidden, cell)
+        output, hidden = model.decoder(input_token, hidden)
         pred_token = torch.argmax(output[:, -1, :], dim=-1)
 
         token_id = pred_token.item()
@@ -1,30 +1,48 @@
 import torch
 import torch.nn as nn
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
 
 class Encoder(nn.Module):
     def __init__(self, vocab_size, embed_size, hidden_size):
         super().__init__()
         self.embedding = nn.Embedding(vocab_size, embed_size, padding_idx=0)
-        self.lstm = nn.LSTM(embed_size, hidden_size, batch_first=True)
+        self.gru = nn.GRU(embed_size, hidden_size, batch_first=True)
 
-    def forward(self, x):
-        embedded = self.embedding(x)
-        _, (hidden, cell) = self.lstm(embedded)
-        return hidden, cell
+    def forward(self, x, lengths=None):
+        # Tokens may arrive in a narrow dtype; embedding needs long indices
+        embedded = self.embedding(x.long())
+        if lengths is not None:
+            # Pack so the GRU only runs the valid timesteps, not the padding
+            embedded = pack_padded_sequence(
+                embedded, lengths, batch_first=True, enforce_sorted=False
+            )
+        _, hidden = self.gru(embedded)
+        return hidden
 
 
 class Decoder(nn.Module):
     def __init__(self, vocab_size, embed_size, hidden_size):
         super().__init__()
         self.embedding = nn.Embedding(vocab_size, embed_size, padding_idx=0)
-        self.lstm = nn.LSTM(embed_size, hidden_size, batch_first=True)
+        self.gru = nn.GRU(embed_size, hidden_size, batch_first=True)
         self.fc = nn.Linear(hidden_size, vocab_size)
 
-    def forward(self, x, hidden, cell):
-        embedded = self.embedding(x)
-        output, (hidden, cell) = self.lstm(embedded, (hidden, cell))
+    def forward(self, x, hidden, lengths=None):
+        embedded = self.embedding(x.long())
+        if lengths is not None:
+            packed = pack_padded_sequence(
+                embedded, lengths, batch_first=True, enforce_sorted=False
+            )
+            output, hidden = self.gru(packed, hidden)
+            # Pad back to the input width so logits align with the targets;
+            # the padded positions are ignored by the loss.
+            output, _ = pad_packed_sequence(
+                output, batch_first=True, total_length=x.size(1)
+            )
+        else:
+            output, hidden = self.gru(embedded, hidden)
         prediction = self.fc(output)
-        return prediction, hidden, cell
+        return prediction, hidden
 
 
 class Seq2Seq(nn.Module):
@@ -33,7 +51,7 @@ class Seq2Seq(nn.Module):
         self.encoder = Encoder(vocab_size, embed_size, hidden_size)
         self.decoder = Decoder(vocab_size, embed_size, hidden_size)
 
-    def forward(self, src, trg):
-        hidden, cell = self.encoder(src)
-        output, _, _ = self.decoder(trg, hidden, cell)
-        return output
\ No newline at end of file
+    def forward(self, src, trg, src_lengths=None, trg_lengths=None):
+        hidden = self.encoder(src, src_lengths)
+        output, _ = self.decoder(trg, hidden, trg_lengths)
+        return output
@@ -1,76 +1,123 @@
 import json
+from pathlib import Path
+
 import torch
 import torch.nn as nn
 import torch.optim as optim
 from torch.nn.utils.rnn import pad_sequence
+from torch.utils.data import DataLoader, TensorDataset
 from model import Seq2Seq
 
-# Load dataset
-with open("dataset.json", "r") as f:
-    data = json.load(f)
-
-pairs = []
-for item in data[:1000]:
-    input_text = item["problem"]
-    output_text = json.dumps(item["solution_tree"])
-    pairs.append((input_text, output_text))
-
-# Build vocabulary
-all_text = "".join([inp + out for inp, out in pairs])
-chars = sorted(list(set(all_text)))
-
-special_tokens = ["<PAD>", "<START>", "<END>"]
-stoi = {token: i for i, token in enumerate(special_tokens)}
-index_offset = len(stoi)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+TOKENS_CACHE = Path("tokens.pt")
+
+if TOKENS_CACHE.exists():
+    # Reuse the tokenized dataset from a previous run
+    blob = torch.load(TOKENS_CACHE)
+    inputs = blob["inputs"]
+    targets = blob["targets"]
+    stoi = blob["stoi"]
+    itos = blob["itos"]
+else:
+    # Load dataset
+    with open("dataset.json", "r") as f:
+        data = json.load(f)
+
+    pairs = []
+    for item in data[:1000]:
+        input_text = item["problem"]
+        output_text = json.dumps(item["solution_tree"])
+        pairs.append((input_text, output_text))
+
+    # Build vocabulary
+    all_text = "".join([inp + out for inp, out in pairs])
+    chars = sorted(list(set(all_text)))
+
+    special_tokens = ["<PAD>", "<START>", "<END>"]
+    stoi = {token: i for i, token in enumerate(special_tokens)}
+    index_offset = len(stoi)
+
+    for ch in chars:
+        stoi[ch] = index_offset
+        index_offset += 1
+
+    itos = {i: ch for ch, i in stoi.items()}
+
+    def encode(text, add_special=False):
+        tokens = []
+        if add_special:
+            tokens.append(stoi["<START>"])
+        for ch in text:
+            tokens.append(stoi[ch])
+        if add_special:
+            tokens.append(stoi["<END>"])
+        # int16 is plenty for a ~100-char vocabulary; cast to long at the
+        # embedding lookup instead of storing 8 bytes per token
+        return torch.tensor(tokens, dtype=torch.int16)
+
+    # Encode dataset
+    inputs = []
+    targets = []
+
+    for inp, out in pairs:
+        inputs.append(encode(inp))
+        targets.append(encode(out, add_special=True))
+
+    inputs = pad_sequence(inputs, batch_first=True, padding_value=stoi["<PAD>"])
+    targets = pad_sequence(targets, batch_first=True, padding_value=stoi["<PAD>"])
+
+    torch.save({"inputs": inputs, "targets": targets, "stoi": stoi, "itos": itos}, TOKENS_CACHE)
 
-for ch in chars:
-    stoi[ch] = index_offset
-    index_offset += 1
-
-itos = {i: ch for ch, i in stoi.items()}
 vocab_size = len(stoi)
 
-def encode(text, add_special=False):
-    tokens = []
-    if add_special:
-        tokens.append(stoi["<START>"])
-    for ch in text:
-        tokens.append(stoi[ch])
-    if add_special:
-        tokens.append(stoi["<END>"])
-    return torch.tensor(tokens, dtype=torch.long)
-
-# Encode dataset
-inputs = []
-targets = []
-
-for inp, out in pairs:
-    inputs.append(encode(inp))
-    targets.append(encode(out, add_special=True))
+loader = DataLoader(
+    TensorDataset(inputs, targets),
+    batch_size=64,
+    shuffle=True,
+    pin_memory=(device.type == "cuda"),
+)
 
-inputs = pad_sequence(inputs, batch_first=True, padding_value=stoi["<PAD>"])
-targets = pad_sequence(targets, batch_first=True, padding_value=stoi["<PAD>"])
-
-model = Seq2Seq(vocab_size)
+model = Seq2Seq(vocab_size).to(device)
+compiled_model = torch.compile(model)
 criterion = nn.CrossEntropyLoss(ignore_index=stoi["<PAD>"])
 optimizer = optim.Adam(model.parameters(), lr=0.001)
 
+# Mixed precision on GPU (bf16 autocast); full precision on CPU
+use_amp = device.type == "cuda"
+scaler = torch.amp.GradScaler(device.type, enabled=use_amp)
+
 # Train longer
 for epoch in range(50):
-    optimizer.zero_grad()
-
-    outputs = model(inputs, targets[:, :-1])
-
-    loss = criterion(
-        outputs.reshape(-1, vocab_size),
-        targets[:, 1:].reshape(-1)
-    )
-
-    loss.backward()
-    optimizer.step()
-
-    print(f"Epoch {epoch}, Loss: {loss.item():.4f}")
-
+    total_loss = 0.0
+    for src, trg in loader:
+        src = src.to(device, non_blocking=True)
+        trg = trg.to(device, non_blocking=True)
+
+        optimizer.zero_grad()
+
+        # Valid (non-PAD) lengths so the GRUs skip padded timesteps
+        trg_in = trg[:, :-1]
+        src_lengths = (src != stoi["<PAD>"]).sum(dim=1).cpu()
+        trg_lengths = (trg_in != stoi["<PAD>"]).sum(dim=1).cpu()
+
+        with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_amp):
+            outputs = compiled_model(src, trg_in, src_lengths, trg_lengths)
+            loss = criterion(
+                outputs.reshape(-1, vocab_size),
+                trg[:, 1:].reshape(-1).long()
+            )
+
+        scaler.scale(loss).backward()
+        scaler.step(optimizer)
+        scaler.update()
+        total_loss += loss.item()
+
+    print(f"Epoch {epoch}, Loss: {total_loss / len(loader):.4f}")
+
+# Save from the underlying module (no torch.compile prefix), on CPU so
+# inference.py can load without a GPU.
+model.cpu()
 torch.save({
     "model_state": model.state_dict(),
     "stoi": stoi,